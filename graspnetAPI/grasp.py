@@ -1,18 +1,80 @@
 __author__ = 'mhgou'
 
+import math
 import numpy as np
 import open3d as o3d
-import copy
 import cv2
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional, the decorated functions run as plain python without it
+    def njit(*args, **kwargs):
+        return lambda func: func
 
-from .utils.utils import plot_gripper_pro_max, batch_rgbdxyz_2_rgbxy_depth, get_batch_key_points, batch_key_points_2_tuple, framexy_depth_2_xyz, batch_framexy_depth_2_xyz, center_depth, key_point_2_rotation, batch_center_depth, batch_framexy_depth_2_xyz, batch_key_point_2_rotation
+from .utils.utils import plot_gripper_pro_max, batch_plot_gripper_pro_max, batch_rgbdxyz_2_rgbxy_depth, batch_key_points_2_tuple, framexy_depth_2_xyz, batch_framexy_depth_2_xyz, center_depth, key_point_2_rotation, batch_center_depth, batch_framexy_depth_2_xyz, batch_key_point_2_rotation
 
 GRASP_ARRAY_LEN = 17
 RECT_GRASP_ARRAY_LEN = 7
 EPS = 1e-8
 
+# gripper key points (center, open point, upper point, lower point) in the gripper frame,
+# split into a constant part and a part that scales with the grasp width.
+KEY_POINTS_DEPTH_BASE = 0.02
+KEY_POINTS_HEIGHT = 0.02
+KEY_POINTS_TEMPLATE = np.array([
+    [-KEY_POINTS_DEPTH_BASE, 0, 0],
+    [-KEY_POINTS_DEPTH_BASE, 0, 0],
+    [-KEY_POINTS_DEPTH_BASE, 0, KEY_POINTS_HEIGHT / 2],
+    [-KEY_POINTS_DEPTH_BASE, 0, -KEY_POINTS_HEIGHT / 2]
+], dtype = np.float32)
+KEY_POINTS_WIDTH_TEMPLATE = np.array([
+    [0, 0, 0],
+    [0, -0.5, 0],
+    [0, -0.5, 0],
+    [0, -0.5, 0]
+], dtype = np.float32)
+
+def _batch_key_points_matmul(trans, rots, widths):
+    '''
+    **Input:**
+
+    - trans: np.array(-1,3) of the translation
+
+    - rots: np.array(-1,3,3) of the rotation matrix
+
+    - widths: np.array(-1) of the grasp width
+
+    **Output:**
+
+    - key_points: np.array(-1,4,3) of the key point of the grasp, same as get_batch_key_points.
+    '''
+    template = KEY_POINTS_TEMPLATE + widths.astype(np.float32)[:, np.newaxis, np.newaxis] * KEY_POINTS_WIDTH_TEMPLATE
+    return np.matmul(template, rots.swapaxes(-1, -2)) + trans[:, np.newaxis, :]
+
+@njit(cache = True)
+def _rect_corners(center_x, center_y, open_x, open_y, height):
+    '''
+    **Input:**
+
+    - center_x, center_y, open_x, open_y, height: float of the rectangle grasp.
+
+    **Output:**
+
+    - tuple of the four corners p1, p2, p3, p4, each of them is a tuple of int x, y.
+    '''
+    axis_x = open_x - center_x
+    axis_y = open_y - center_y
+    norm = math.sqrt(axis_x * axis_x + axis_y * axis_y)
+    normal_x = -axis_y / norm * height / 2
+    normal_y = axis_x / norm * height / 2
+    p1 = (int(center_x + normal_x + axis_x), int(center_y + normal_y + axis_y))
+    p2 = (int(center_x + normal_x - axis_x), int(center_y + normal_y - axis_y))
+    p3 = (int(center_x - normal_x - axis_x), int(center_y - normal_y - axis_y))
+    p4 = (int(center_x - normal_x + axis_x), int(center_y - normal_y + axis_y))
+    return p1, p2, p3, p4
+
 class Grasp():
-    def __init__(self, *args):
+    def __init__(self, *args, copy = True):
         '''
         **Input:**
 
@@ -21,22 +83,32 @@ class Grasp():
         - the format of numpy array is [score, width, height, depth, rotation_matrix(9), translation(3), object_id]
 
         - the length of the numpy array is 17.
+
+        - copy: bool, only used when a numpy array is given. If False, the Grasp is a view of the array and changing one changes the other.
         '''
         if len(args) == 0:
             self.grasp_array = np.array([0, 0.02, 0.02, 0.02, 1, 0, 0, 0, 1 ,0 , 0, 0, 1, 0, 0, 0, -1], dtype = np.float64)
         elif len(args) == 1:
-            if type(args[0]) == np.ndarray:
-                self.grasp_array = copy.deepcopy(args[0])
+            if isinstance(args[0], np.ndarray):
+                self.grasp_array = args[0].copy() if copy else args[0]
             else:
                 raise TypeError('if only one arg is given, it must be np.ndarray.')
         elif len(args) == 7:
             score, width, height, depth, rotation_matrix, translation, object_id = args
-            self.grasp_array = np.concatenate([np.array((score, width, height, depth)),rotation_matrix.reshape(-1), translation, np.array((object_id)).reshape(-1)]).astype(np.float64)
+            self.grasp_array = np.empty(GRASP_ARRAY_LEN, dtype = np.float64)
+            self.grasp_array[0] = score
+            self.grasp_array[1] = width
+            self.grasp_array[2] = height
+            self.grasp_array[3] = depth
+            self.grasp_array[4:13] = rotation_matrix.reshape(-1)
+            self.grasp_array[13:16] = translation
+            self.grasp_array[16] = object_id
         else:
             raise ValueError('only 1 or 7 arguments are accepted')
     
     def __repr__(self):
-        return 'Grasp: score:{}, width:{}, height:{}, depth:{}, translation:{}\nrotation:\n{}\nobject id:{}'.format(self.score, self.width, self.height, self.depth, self.translation, self.rotation_matrix, self.object_id)
+        grasp_array = self.grasp_array
+        return 'Grasp: score:{}, width:{}, height:{}, depth:{}, translation:{}\nrotation:\n{}\nobject id:{}'.format(float(grasp_array[0]), float(grasp_array[1]), float(grasp_array[2]), float(grasp_array[3]), grasp_array[13:16], grasp_array[4:13].reshape((3,3)), int(grasp_array[16]))
 
     @property
     def score(self):
@@ -186,8 +258,9 @@ class Grasp():
         '''
         rotation = T[:3,:3]
         translation = T[:3,3]
-        self.translation = np.dot(rotation, self.translation.reshape((3,1))).reshape(-1) + translation
-        self.rotation_matrix = np.dot(rotation, self.rotation_matrix)
+        grasp_array = self.grasp_array
+        grasp_array[13:16] = np.dot(rotation, grasp_array[13:16]) + translation
+        grasp_array[4:13] = np.dot(rotation, grasp_array[4:13].reshape((3,3))).reshape(-1)
         return self
 
     def to_open3d_geometry(self, color=None):
@@ -200,14 +273,15 @@ class Grasp():
 
         - list of open3d.geometry.Geometry of the gripper.
         '''
-        return plot_gripper_pro_max(self.translation, self.rotation_matrix, self.width, self.depth, score = self.score, color = color)
+        grasp_array = self.grasp_array
+        return plot_gripper_pro_max(grasp_array[13:16], grasp_array[4:13].reshape((3,3)), float(grasp_array[1]), float(grasp_array[3]), score = float(grasp_array[0]), color = color)
 
 class GraspGroup():
     def __init__(self, *args):
         '''
         **Input:**
 
-        - args can be (1) nothing (2) numpy array of grasp group array (3) str of the npy file.
+        - args can be (1) nothing (2) numpy array of grasp group array (3) str of the npy file (4) list of Grasp instances.
         '''
         if len(args) == 0:
             self.grasp_group_array = np.zeros((0, GRASP_ARRAY_LEN), dtype=np.float64)
@@ -215,11 +289,64 @@ class GraspGroup():
             if isinstance(args[0], np.ndarray):
                 self.grasp_group_array = args[0]
             elif isinstance(args[0], str):
-                self.grasp_group_array = np.load(args[0])
+                self.grasp_group_array = np.load(args[0], allow_pickle = False)
+            elif isinstance(args[0], list):
+                self.grasp_group_array = self._stack_grasps(args[0])
             else:
-                raise ValueError('args must be nothing, numpy array or string.')
+                raise ValueError('args must be nothing, numpy array, string or list of Grasp.')
         else:
-            raise ValueError('args must be nothing, numpy array or string.')
+            raise ValueError('args must be nothing, numpy array, string or list of Grasp.')
+
+    @staticmethod
+    def _stack_grasps(grasp_list):
+        '''
+        **Input:**
+
+        - grasp_list: list of Grasp instances.
+
+        **Output:**
+
+        - numpy array of shape (len(grasp_list), GRASP_ARRAY_LEN), filled in a single pass.
+        '''
+        grasp_group_array = np.empty((len(grasp_list), GRASP_ARRAY_LEN), dtype=np.float64)
+        for i, grasp in enumerate(grasp_list):
+            if not isinstance(grasp, Grasp):
+                raise TypeError('Unknown type:{}'.format(grasp))
+            grasp_group_array[i] = grasp.grasp_array
+        return grasp_group_array
+
+    @classmethod
+    def from_arrays(cls, scores, widths, heights, depths, rotations, translations, object_ids):
+        '''
+        **Input:**
+
+        - scores, widths, heights, depths, object_ids: numpy array of shape (-1, ).
+
+        - rotations: numpy array of shape (-1, 3, 3) or (-1, 9) of the rotation matrices.
+
+        - translations: numpy array of shape (-1, 3) of the translations.
+
+        **Output:**
+
+        - GraspGroup instance filled column by column without creating Grasp instances.
+        '''
+        num_grasp = np.size(scores)
+        if np.shape(rotations) not in ((num_grasp, 3, 3), (num_grasp, 9)):
+            raise ValueError('rotations must be of shape ({0}, 3, 3) or ({0}, 9), got {1}'.format(num_grasp, np.shape(rotations)))
+        if np.shape(translations) != (num_grasp, 3):
+            raise ValueError('translations must be of shape ({}, 3), got {}'.format(num_grasp, np.shape(translations)))
+        for name, value in (('widths', widths), ('heights', heights), ('depths', depths), ('object_ids', object_ids)):
+            if np.size(value) != num_grasp:
+                raise ValueError('{} must have {} elements, got {}'.format(name, num_grasp, np.size(value)))
+        grasp_group_array = np.empty((num_grasp, GRASP_ARRAY_LEN), dtype=np.float64)
+        grasp_group_array[:, 0] = np.reshape(scores, -1)
+        grasp_group_array[:, 1] = np.reshape(widths, -1)
+        grasp_group_array[:, 2] = np.reshape(heights, -1)
+        grasp_group_array[:, 3] = np.reshape(depths, -1)
+        grasp_group_array[:, 4:13] = np.reshape(rotations, (-1, 9))
+        grasp_group_array[:, 13:16] = translations
+        grasp_group_array[:, 16] = np.reshape(object_ids, -1)
+        return cls(grasp_group_array)
 
     def __len__(self):
         '''
@@ -233,13 +360,13 @@ class GraspGroup():
         repr = '----------\nGrasp Group, Number={}:\n'.format(self.__len__())
         if self.__len__() <= 6:
             for grasp_array in self.grasp_group_array:
-                repr += Grasp(grasp_array).__repr__() + '\n'
+                repr += Grasp(grasp_array, copy = False).__repr__() + '\n'
         else:
             for i in range(3):
-                repr += Grasp(self.grasp_group_array[i]).__repr__() + '\n'
+                repr += Grasp(self.grasp_group_array[i], copy = False).__repr__() + '\n'
             repr += '......\n'
             for i in range(3):
-                repr += Grasp(self.grasp_group_array[-(3-i)]).__repr__() + '\n'
+                repr += Grasp(self.grasp_group_array[-(3-i)], copy = False).__repr__() + '\n'
         return repr + '----------'
 
     def __getitem__(self, index):
@@ -254,15 +381,15 @@ class GraspGroup():
 
         - if index is slice, np.ndarray or list, return GraspGroup instance.
         '''
-        if type(index) == int:
+        if isinstance(index, (int, np.integer)) and not isinstance(index, bool):
             return Grasp(self.grasp_group_array[index])
-        elif type(index) == slice:
+        elif isinstance(index, slice):
             graspgroup = GraspGroup()
-            graspgroup.grasp_group_array = copy.deepcopy(self.grasp_group_array[index])
+            graspgroup.grasp_group_array = self.grasp_group_array[index].copy()
             return graspgroup
-        elif type(index) == np.ndarray:
+        elif isinstance(index, np.ndarray):
             return GraspGroup(self.grasp_group_array[index])
-        elif type(index) == list:
+        elif isinstance(index, list):
             return GraspGroup(self.grasp_group_array[index])
         else:
             raise TypeError('unknown type "{}" for calling __getitem__ for GraspGroup'.format(type(index)))
@@ -284,7 +411,7 @@ class GraspGroup():
         - scores: numpy array of shape (-1, ) of the scores.
         '''
         assert scores.size == len(self)
-        self.grasp_group_array[:,0] = copy.deepcopy(scores)
+        self.grasp_group_array[:,0] = scores
 
     @property
     def widths(self):
@@ -303,7 +430,7 @@ class GraspGroup():
         - widths: numpy array of shape (-1, ) of the widths.
         '''
         assert widths.size == len(self)
-        self.grasp_group_array[:,1] = copy.deepcopy(widths)
+        self.grasp_group_array[:,1] = widths
 
     @property
     def heights(self):
@@ -322,7 +449,7 @@ class GraspGroup():
         - heights: numpy array of shape (-1, ) of the heights.
         '''
         assert heights.size == len(self)
-        self.grasp_group_array[:,2] = copy.deepcopy(heights)
+        self.grasp_group_array[:,2] = heights
 
     @property
     def depths(self):
@@ -341,7 +468,7 @@ class GraspGroup():
         - depths: numpy array of shape (-1, ) of the depths.
         '''
         assert depths.size == len(self)
-        self.grasp_group_array[:,3] = copy.deepcopy(depths)
+        self.grasp_group_array[:,3] = depths
 
     @property
     def rotation_matrices(self):
@@ -360,7 +487,7 @@ class GraspGroup():
         - rotation_matrices: numpy array of shape (-1, 3, 3) of the rotation_matrices.
         '''
         assert rotation_matrices.shape == (len(self), 3, 3)
-        self.grasp_group_array[:,4:13] = copy.deepcopy(rotation_matrices.reshape((-1, 9)))       
+        self.grasp_group_array[:,4:13] = rotation_matrices.reshape((-1, 9))
 
     @property
     def translations(self):
@@ -379,7 +506,7 @@ class GraspGroup():
         - translations: numpy array of shape (-1, 3) of the translations.
         '''
         assert translations.shape == (len(self), 3)
-        self.grasp_group_array[:,13:16] = copy.deepcopy(translations)
+        self.grasp_group_array[:,13:16] = translations
 
     @property
     def object_ids(self):
@@ -398,7 +525,7 @@ class GraspGroup():
         - object_ids: numpy array of shape (-1, ) of the object_ids.
         '''
         assert object_ids.size == len(self)
-        self.grasp_group_array[:,16] = copy.deepcopy(object_ids)
+        self.grasp_group_array[:,16] = object_ids
 
     def transform(self, T):
         '''
@@ -420,12 +547,16 @@ class GraspGroup():
         '''
         **Input:**
 
-        - element: Grasp instance or GraspGroup instance.
+        - element: Grasp instance, GraspGroup instance or list of Grasp instances.
+
+        .. note:: Each call copies the whole grasp group array, add many grasps with a list instead of calling add in a loop.
         '''
         if isinstance(element, Grasp):
             self.grasp_group_array = np.concatenate((self.grasp_group_array, element.grasp_array.reshape((-1, GRASP_ARRAY_LEN))))
         elif isinstance(element, GraspGroup):
             self.grasp_group_array = np.concatenate((self.grasp_group_array, element.grasp_group_array))
+        elif isinstance(element, list):
+            self.grasp_group_array = np.concatenate((self.grasp_group_array, self._stack_grasps(element)))
         else:
             raise TypeError('Unknown type:{}'.format(element))
         return self
@@ -434,18 +565,30 @@ class GraspGroup():
         '''
         **Input:**
 
-        - index: list of the index of grasp
+        - index: list or numpy array of the index of grasp, or boolean numpy array of shape (-1, ) that is True for the grasps to remove
         '''
-        self.grasp_group_array = np.delete(self.grasp_group_array, index, axis = 0)
+        # a single masked copy, boolean masks are used as they are
+        if not isinstance(index, slice):
+            index = np.asarray(index)
+            if index.size == 0:
+                return self
+        keep = np.ones(self.__len__(), dtype = bool)
+        keep[index] = False
+        self.grasp_group_array = self.grasp_group_array[keep]
         return self
 
-    def from_npy(self, npy_file_path):
+    def from_npy(self, npy_file_path, mmap = False):
         '''
         **Input:**
 
         - npy_file_path: string of the file path.
+
+        - mmap: bool, if True, the file is memory-mapped in copy-on-write mode, only the rows that are accessed are read from disk and changes are not written back to the file.
         '''
-        self.grasp_group_array = np.load(npy_file_path)
+        if mmap:
+            self.grasp_group_array = np.load(npy_file_path, mmap_mode = 'c', allow_pickle = False)
+        else:
+            self.grasp_group_array = np.load(npy_file_path, allow_pickle = False)
         return self
 
     def save_npy(self, npy_file_path):
@@ -454,7 +597,7 @@ class GraspGroup():
 
         - npy_file_path: string of the file path.
         '''
-        np.save(npy_file_path, self.grasp_group_array)
+        np.save(npy_file_path, self.grasp_group_array, allow_pickle = False)
 
     def to_open3d_geometry_list(self):
         '''
@@ -463,10 +606,23 @@ class GraspGroup():
         - list of open3d.geometry.Geometry of the grippers.
         '''
         geometry = []
-        for i in range(len(self.grasp_group_array)):
-            g = Grasp(self.grasp_group_array[i])
-            geometry.append(g.to_open3d_geometry())
+        for grasp_array in self.grasp_group_array:
+            geometry.append(plot_gripper_pro_max(grasp_array[13:16], grasp_array[4:13].reshape((3,3)), float(grasp_array[1]), float(grasp_array[3]), score = float(grasp_array[0])))
         return geometry
+
+    def to_open3d_geometry_batch(self, color = None):
+        '''
+        **Input:**
+
+        - color: optional, tuple of shape (3) denotes (r, g, b) for all the grippers, e.g., (1,0,0) for red
+
+        **Output:**
+
+        - open3d.geometry.TriangleMesh of all the grippers merged into one mesh.
+
+        .. note:: Much faster than to_open3d_geometry_list for large grasp groups, but the grippers can not be handled separately.
+        '''
+        return batch_plot_gripper_pro_max(self.translations, self.rotation_matrices, self.widths, self.depths, self.scores, color = color)
     
     def sort_by_score(self, reverse = False):
         '''
@@ -485,6 +641,30 @@ class GraspGroup():
         self.grasp_group_array = self.grasp_group_array[index]
         return self
 
+    def top_k(self, k, reverse = False):
+        '''
+        **Input:**
+
+        - k: int of the number of grasps to keep.
+
+        - reverse: bool of order, if False, keep the k grasps with the highest scores from high to low, if True, keep the k grasps with the lowest scores from low to high.
+
+        **Output:**
+
+        - GraspGroup instance of the k grasps, the original GraspGroup is not changed.
+
+        .. note:: Only the k selected grasps are sorted, which is faster than sort_by_score when k is much smaller than the number of grasps.
+        '''
+        if k < 0:
+            raise ValueError('k should be no less than 0')
+        scores = self.grasp_group_array[:,0] if reverse else -self.grasp_group_array[:,0]
+        if k < self.__len__():
+            index = np.argpartition(scores, k)[:k]
+        else:
+            index = np.arange(self.__len__())
+        index = index[np.argsort(scores[index])]
+        return GraspGroup(self.grasp_group_array[index])
+
     def random_sample(self, numGrasp = 20):
         '''
         **Input:**
@@ -497,11 +677,9 @@ class GraspGroup():
         '''
         if numGrasp > self.__len__():
             raise ValueError('Number of sampled grasp should be no more than the total number of grasps in the group')
-        shuffled_grasp_group_array = copy.deepcopy(self.grasp_group_array)
-        np.random.shuffle(shuffled_grasp_group_array)
-        shuffled_grasp_group = GraspGroup()
-        shuffled_grasp_group.grasp_group_array = copy.deepcopy(shuffled_grasp_group_array[:numGrasp])
-        return shuffled_grasp_group
+        # only the indices are permuted, the sampled rows are gathered without copying and shuffling every row
+        index = np.random.choice(self.__len__(), numGrasp, replace = False)
+        return GraspGroup(self.grasp_group_array[index])
 
     def to_rect_grasp_group(self, camera):
         '''
@@ -513,27 +691,24 @@ class GraspGroup():
         
         - RectGraspGroup instance or None.
         '''
-        tranlations = self.translations
-        rotations = self.rotation_matrices
-        depths = self.depths
-        scores = self.scores
-        widths = self.widths
-        object_ids = self.object_ids
-
-        mask = (rotations[:, 2, 0] > 0.99)
-        tranlations = tranlations[mask]
-        depths = depths[mask]
-        widths = widths[mask]
-        scores = scores[mask]
-        rotations = rotations[mask]
-        object_ids = object_ids[mask]
-        
-        if tranlations.shape[0] == 0:
+        mask = (self.grasp_group_array[:, 10] > 0.99) # rotation_matrix[2, 0]
+        num_keep = int(np.count_nonzero(mask))
+        if num_keep == 0:
             return None
+        if num_keep == self.__len__():
+            # every grasp is kept, slice the columns from the array itself
+            grasp_group_array = self.grasp_group_array
+        else:
+            # gather the selected rows once and slice the columns from it
+            grasp_group_array = self.grasp_group_array[mask]
 
-        k_points = get_batch_key_points(tranlations, rotations, widths)
-        k_points = k_points.reshape([-1, 3])
-        k_points = k_points.reshape([-1, 4, 3])
+        scores = grasp_group_array[:, 0]
+        widths = grasp_group_array[:, 1]
+        rotations = grasp_group_array[:, 4:13].reshape((-1, 3, 3))
+        tranlations = grasp_group_array[:, 13:16]
+        object_ids = grasp_group_array[:, 16]
+
+        k_points = _batch_key_points_matmul(tranlations, rotations, widths)
         rect_grasp_group_array = batch_key_points_2_tuple(k_points, scores, object_ids, camera)
         rect_grasp_group = RectGraspGroup()
         rect_grasp_group.rect_grasp_group_array = rect_grasp_group_array
@@ -555,7 +730,7 @@ class GraspGroup():
         return GraspGroup(nms_grasp(self.grasp_group_array, translation_thresh, rotation_thresh))
 
 class RectGrasp():
-    def __init__(self, *args):
+    def __init__(self, *args, copy = True):
         '''
         **Input:**
 
@@ -564,19 +739,23 @@ class RectGrasp():
         - the format of numpy array is [center_x, center_y, open_x, open_y, height, score, object_id]
 
         - the length of the numpy array is 7.
+
+        - copy: bool, only used when a numpy array is given. If False, the RectGrasp is a view of the array and changing one changes the other.
         '''
         if len(args) == 1:
-            if type(args[0]) == np.ndarray:
-                self.rect_grasp_array = copy.deepcopy(args[0])
+            if isinstance(args[0], np.ndarray):
+                self.rect_grasp_array = args[0].copy() if copy else args[0]
             else:
                 raise TypeError('if only one arg is given, it must be np.ndarray.')
         elif len(args) == RECT_GRASP_ARRAY_LEN:
-            self.rect_grasp_array = np.array(args).astype(np.float64)
+            # convert straight to float64 instead of materializing an array of the input type first
+            self.rect_grasp_array = np.array(args, dtype = np.float64)
         else:
-            raise ValueError('only one or six arguments are accepted')
+            raise ValueError('only one or seven arguments are accepted')
     
     def __repr__(self):
-        return 'Rectangle Grasp: score:{}, height:{}, open point:{}, center point:{}, object id:{}'.format(self.score, self.height, self.open_point, self.center_point, self.object_id)
+        rect_grasp_array = self.rect_grasp_array
+        return 'Rectangle Grasp: score:{}, height:{}, open point:{}, center point:{}, object id:{}'.format(rect_grasp_array[5], rect_grasp_array[4], (rect_grasp_array[2], rect_grasp_array[3]), (rect_grasp_array[0], rect_grasp_array[1]), int(rect_grasp_array[6]))
 
     @property
     def score(self):
@@ -688,20 +867,12 @@ class RectGrasp():
 
         - numpy array of opencv RGB format that shows the rectangle grasp.
         '''
-        center_x, center_y, open_x, open_y, height, score, object_id = self.rect_grasp_array
-        center = np.array([center_x, center_y])
-        left = np.array([open_x, open_y])
-        axis = left - center
-        normal = np.array([-axis[1], axis[0]])
-        normal = normal / np.linalg.norm(normal) * height / 2
-        p1 = center + normal + axis
-        p2 = center + normal - axis
-        p3 = center - normal - axis
-        p4 = center - normal + axis
-        cv2.line(opencv_rgb, (int(p1[0]),int(p1[1])), (int(p2[0]),int(p2[1])), (0,0,255), 1, 8)
-        cv2.line(opencv_rgb, (int(p2[0]),int(p2[1])), (int(p3[0]),int(p3[1])), (255,0,0), 3, 8)
-        cv2.line(opencv_rgb, (int(p3[0]),int(p3[1])), (int(p4[0]),int(p4[1])), (0,0,255), 1, 8)
-        cv2.line(opencv_rgb, (int(p4[0]),int(p4[1])), (int(p1[0]),int(p1[1])), (255,0,0), 3, 8)
+        center_x, center_y, open_x, open_y, height = self.rect_grasp_array[:5]
+        p1, p2, p3, p4 = _rect_corners(float(center_x), float(center_y), float(open_x), float(open_y), float(height))
+        cv2.line(opencv_rgb, p1, p2, (0,0,255), 1, 8)
+        cv2.line(opencv_rgb, p2, p3, (255,0,0), 3, 8)
+        cv2.line(opencv_rgb, p3, p4, (0,0,255), 1, 8)
+        cv2.line(opencv_rgb, p4, p1, (255,0,0), 3, 8)
         return opencv_rgb
 
     def get_key_points(self):
@@ -758,7 +929,7 @@ class RectGraspGroup():
         '''
         **Input:**
 
-        - args can be (1) nothing (2) numpy array of rect_grasp_group_array (3) str of the numpy file.
+        - args can be (1) nothing (2) numpy array of rect_grasp_group_array (3) str of the numpy file (4) list of RectGrasp instances.
         '''
         if len(args) == 0:
             self.rect_grasp_group_array = np.zeros((0, RECT_GRASP_ARRAY_LEN), dtype=np.float64)
@@ -766,11 +937,59 @@ class RectGraspGroup():
             if isinstance(args[0], np.ndarray):
                 self.rect_grasp_group_array = args[0]
             elif isinstance(args[0], str):
-                self.rect_grasp_group_array = np.load(args[0])
+                self.rect_grasp_group_array = np.load(args[0], allow_pickle = False)
+            elif isinstance(args[0], list):
+                self.rect_grasp_group_array = self._stack_rect_grasps(args[0])
             else:
-                raise ValueError('args must be nothing, numpy array or string.')
+                raise ValueError('args must be nothing, numpy array, string or list of RectGrasp.')
         else:
-            raise ValueError('args must be nothing, numpy array or string.')
+            raise ValueError('args must be nothing, numpy array, string or list of RectGrasp.')
+
+    @staticmethod
+    def _stack_rect_grasps(rect_grasp_list):
+        '''
+        **Input:**
+
+        - rect_grasp_list: list of RectGrasp instances.
+
+        **Output:**
+
+        - numpy array of shape (len(rect_grasp_list), RECT_GRASP_ARRAY_LEN), filled in a single pass.
+        '''
+        rect_grasp_group_array = np.empty((len(rect_grasp_list), RECT_GRASP_ARRAY_LEN), dtype=np.float64)
+        for i, rect_grasp in enumerate(rect_grasp_list):
+            if not isinstance(rect_grasp, RectGrasp):
+                raise TypeError('Unknown type:{}'.format(rect_grasp))
+            rect_grasp_group_array[i] = rect_grasp.rect_grasp_array
+        return rect_grasp_group_array
+
+    @classmethod
+    def from_arrays(cls, center_points, open_points, heights, scores, object_ids):
+        '''
+        **Input:**
+
+        - center_points, open_points: numpy array of shape (-1, 2).
+
+        - heights, scores, object_ids: numpy array of shape (-1, ).
+
+        **Output:**
+
+        - RectGraspGroup instance filled column by column without creating RectGrasp instances.
+        '''
+        num_grasp = np.size(scores)
+        for name, value in (('center_points', center_points), ('open_points', open_points)):
+            if np.shape(value) != (num_grasp, 2):
+                raise ValueError('{} must be of shape ({}, 2), got {}'.format(name, num_grasp, np.shape(value)))
+        for name, value in (('heights', heights), ('object_ids', object_ids)):
+            if np.size(value) != num_grasp:
+                raise ValueError('{} must have {} elements, got {}'.format(name, num_grasp, np.size(value)))
+        rect_grasp_group_array = np.empty((num_grasp, RECT_GRASP_ARRAY_LEN), dtype=np.float64)
+        rect_grasp_group_array[:, 0:2] = center_points
+        rect_grasp_group_array[:, 2:4] = open_points
+        rect_grasp_group_array[:, 4] = np.reshape(heights, -1)
+        rect_grasp_group_array[:, 5] = np.reshape(scores, -1)
+        rect_grasp_group_array[:, 6] = np.reshape(object_ids, -1)
+        return cls(rect_grasp_group_array)
 
     def __len__(self):
         '''
@@ -784,13 +1003,13 @@ class RectGraspGroup():
         repr = '----------\nRectangle Grasp Group, Number={}:\n'.format(self.__len__())
         if self.__len__() <= 10:
             for rect_grasp_array in self.rect_grasp_group_array:
-                repr += RectGrasp(rect_grasp_array).__repr__() + '\n'
+                repr += RectGrasp(rect_grasp_array, copy = False).__repr__() + '\n'
         else:
             for i in range(5):
-                repr += RectGrasp(self.rect_grasp_group_array[i]).__repr__() + '\n'
+                repr += RectGrasp(self.rect_grasp_group_array[i], copy = False).__repr__() + '\n'
             repr += '......\n'
             for i in range(5):
-                repr += RectGrasp(self.rect_grasp_group_array[-(5-i)]).__repr__() + '\n'
+                repr += RectGrasp(self.rect_grasp_group_array[-(5-i)], copy = False).__repr__() + '\n'
         return repr + '----------'
             
     def __getitem__(self, index):
@@ -805,12 +1024,15 @@ class RectGraspGroup():
 
         - if index is slice, np.ndarray or list, return RectGraspGroup instance.
         '''
-        if isinstance(index, int):
+        if isinstance(index, (int, np.integer)) and not isinstance(index, bool):
             return RectGrasp(self.rect_grasp_group_array[index])
-        elif isinstance(index, slice) or isinstance(index, list) or isinstance(index, np.ndarray):
+        elif isinstance(index, slice):
             rectgraspgroup = RectGraspGroup()
-            rectgraspgroup.rect_grasp_group_array = copy.deepcopy(self.rect_grasp_group_array[index])
+            rectgraspgroup.rect_grasp_group_array = self.rect_grasp_group_array[index].copy()
             return rectgraspgroup
+        elif isinstance(index, list) or isinstance(index, np.ndarray):
+            # advanced indexing already returns a copy
+            return RectGraspGroup(self.rect_grasp_group_array[index])
         else:
             raise TypeError('unknown type "{}" for calling __getitem__ for RectGraspGroup'.format(type(index)))
 
@@ -818,9 +1040,18 @@ class RectGraspGroup():
         '''
         **Input:**
 
-        - rect_grasp: RectGrasp instance
+        - rect_grasp: RectGrasp instance, RectGraspGroup instance or list of RectGrasp instances.
+
+        .. note:: Each call copies the whole rect grasp group array, add many rect grasps with a list instead of calling add in a loop.
         '''
-        self.rect_grasp_group_array = np.concatenate((self.rect_grasp_group_array, rect_grasp.rect_grasp_array.reshape((-1, RECT_GRASP_ARRAY_LEN))))
+        if isinstance(rect_grasp, RectGrasp):
+            self.rect_grasp_group_array = np.concatenate((self.rect_grasp_group_array, rect_grasp.rect_grasp_array.reshape((-1, RECT_GRASP_ARRAY_LEN))))
+        elif isinstance(rect_grasp, RectGraspGroup):
+            self.rect_grasp_group_array = np.concatenate((self.rect_grasp_group_array, rect_grasp.rect_grasp_group_array))
+        elif isinstance(rect_grasp, list):
+            self.rect_grasp_group_array = np.concatenate((self.rect_grasp_group_array, self._stack_rect_grasps(rect_grasp)))
+        else:
+            raise TypeError('Unknown type:{}'.format(rect_grasp))
         return self
 
     @property
@@ -840,7 +1071,7 @@ class RectGraspGroup():
         - scores: numpy array of shape (-1, ) of the scores.
         '''
         assert scores.size == len(self)
-        self.rect_grasp_group_array[:, 5] = copy.deepcopy(scores)
+        self.rect_grasp_group_array[:, 5] = scores
 
     @property
     def heights(self):
@@ -859,7 +1090,7 @@ class RectGraspGroup():
         - heights: numpy array of shape (-1, ) of the heights.
         '''
         assert heights.size == len(self)
-        self.rect_grasp_group_array[:, 4] = copy.deepcopy(heights)
+        self.rect_grasp_group_array[:, 4] = heights
 
     @property
     def open_points(self):
@@ -878,7 +1109,7 @@ class RectGraspGroup():
         - open_points: numpy array of shape (-1, 2) of the open_points.
         '''
         assert open_points.shape == (len(self), 2)
-        self.rect_grasp_group_array[:, 2:4] = copy.deepcopy(open_points)
+        self.rect_grasp_group_array[:, 2:4] = open_points
 
     @property
     def center_points(self):
@@ -897,7 +1128,7 @@ class RectGraspGroup():
         - center_points: numpy array of shape (-1, 2) of the center_points.
         '''
         assert center_points.shape == (len(self), 2)
-        self.rect_grasp_group_array[:, 0:2] = copy.deepcopy(center_points)
+        self.rect_grasp_group_array[:, 0:2] = center_points
 
     @property
     def object_ids(self):
@@ -906,7 +1137,8 @@ class RectGraspGroup():
 
         - numpy array of the object ids that this grasp grasps.
         '''
-        return np.round(self.rect_grasp_group_array[:, 6]).astype(np.int32)
+        # round straight into the int32 output instead of allocating a rounded float copy first
+        return np.rint(self.rect_grasp_group_array[:, 6], out = np.empty(self.__len__(), dtype = np.int32), casting = 'unsafe')
 
     @object_ids.setter
     def object_ids(self, object_ids):
@@ -916,23 +1148,36 @@ class RectGraspGroup():
         - heiobject_idsghts: numpy array of shape (-1, ) of the object_ids.
         '''
         assert object_ids.size == len(self)
-        self.rect_grasp_group_array[:, 6] = copy.deepcopy(object_ids)
+        self.rect_grasp_group_array[:, 6] = object_ids
 
     def remove(self, index):
         '''
         **Input:**
 
-        - index: list of the index of rect_grasp
+        - index: list or numpy array of the index of rect_grasp, or boolean numpy array of shape (-1, ) that is True for the rect_grasps to remove
         '''
-        self.rect_grasp_group_array = np.delete(self.rect_grasp_group_array, index, axis = 0)
+        # a single masked copy, boolean masks are used as they are
+        if not isinstance(index, slice):
+            index = np.asarray(index)
+            if index.size == 0:
+                return self
+        keep = np.ones(self.__len__(), dtype = bool)
+        keep[index] = False
+        self.rect_grasp_group_array = self.rect_grasp_group_array[keep]
+        return self
 
-    def from_npy(self, npy_file_path):
+    def from_npy(self, npy_file_path, mmap = False):
         '''
         **Input:**
 
         - npy_file_path: string of the file path.
+
+        - mmap: bool, if True, the file is memory-mapped in copy-on-write mode, only the rows that are accessed are read from disk and changes are not written back to the file.
         '''
-        self.rect_grasp_group_array = np.load(npy_file_path)
+        if mmap:
+            self.rect_grasp_group_array = np.load(npy_file_path, mmap_mode = 'c', allow_pickle = False)
+        else:
+            self.rect_grasp_group_array = np.load(npy_file_path, allow_pickle = False)
         return self
 
     def save_npy(self, npy_file_path):
@@ -941,7 +1186,7 @@ class RectGraspGroup():
 
         - npy_file_path: string of the file path.
         '''
-        np.save(npy_file_path, self.rect_grasp_group_array)
+        np.save(npy_file_path, self.rect_grasp_group_array, allow_pickle = False)
 
     def to_opencv_image(self, opencv_rgb, numGrasp = 0):
         '''
@@ -955,28 +1200,32 @@ class RectGraspGroup():
 
         - numpy array of opencv RGB format that shows the rectangle grasps.
         '''
-        img = copy.deepcopy(opencv_rgb)
+        img = opencv_rgb.copy()
         if numGrasp == 0:
             numGrasp = self.__len__()
-        shuffled_rect_grasp_group_array = copy.deepcopy(self.rect_grasp_group_array)
-        np.random.shuffle(shuffled_rect_grasp_group_array)
-        for rect_grasp_array in shuffled_rect_grasp_group_array[:numGrasp]:
-            center_x, center_y, open_x, open_y, height, score, object_id = rect_grasp_array
-            center = np.array([center_x, center_y])
-            left = np.array([open_x, open_y])
-            axis = left - center
-            normal = np.array([-axis[1], axis[0]])
-            normal = normal / np.linalg.norm(normal) * height / 2
-            p1 = center + normal + axis
-            p2 = center + normal - axis
-            p3 = center - normal - axis
-            p4 = center - normal + axis
-            cv2.line(img, (int(p1[0]),int(p1[1])), (int(p2[0]),int(p2[1])), (0,0,255), 1, 8)
-            cv2.line(img, (int(p2[0]),int(p2[1])), (int(p3[0]),int(p3[1])), (255,0,0), 3, 8)
-            cv2.line(img, (int(p3[0]),int(p3[1])), (int(p4[0]),int(p4[1])), (0,0,255), 1, 8)
-            cv2.line(img, (int(p4[0]),int(p4[1])), (int(p1[0]),int(p1[1])), (255,0,0), 3, 8)
+        shuffled_rect_grasp_group = self.random_sample(min(numGrasp, self.__len__()))
+        if len(shuffled_rect_grasp_group) == 0:
+            return img
+        corners = shuffled_rect_grasp_group.batch_get_corner_points().astype(np.int32)
+        # p1-p2 and p3-p4 are drawn thin, p2-p3 and p4-p1 are drawn thick
+        thin_lines = corners.reshape((-1, 2, 2))
+        thick_lines = corners[:, [1, 2, 3, 0]].reshape((-1, 2, 2))
+        cv2.polylines(img, list(thin_lines), False, (0,0,255), 1, 8)
+        cv2.polylines(img, list(thick_lines), False, (255,0,0), 3, 8)
         return img
 
+    def batch_get_corner_points(self):
+        '''
+        **Output:**
+
+        - numpy array of shape (-1, 4, 2) of the corners p1, p2, p3, p4 of the rectangles.
+        '''
+        centers = self.center_points # (-1, 2)
+        axis = self.open_points - centers # (-1, 2)
+        normal = np.stack([-axis[:, 1], axis[:, 0]], axis = 1)
+        normal = normal / np.linalg.norm(normal, axis = 1, keepdims = True) * self.heights[:, np.newaxis] / 2
+        return np.stack([centers + normal + axis, centers + normal - axis, centers - normal - axis, centers - normal + axis], axis = 1)
+
     def batch_get_key_points(self):
         '''
         **Output:**
@@ -1033,16 +1282,14 @@ class RectGraspGroup():
         centers_xyz = np.array(batch_framexy_depth_2_xyz(centers[:, 0], centers[:, 1], depths_2d, camera)).T
         open_points_xyz = np.array(batch_framexy_depth_2_xyz(open_points[:, 0], open_points[:, 1], depths_2d, camera)).T
         upper_points_xyz = np.array(batch_framexy_depth_2_xyz(upper_points[:, 0], upper_points[:, 1], depths_2d, camera)).T
-        depths = 0.02 * np.ones((valid_num, 1))
-        heights = (np.linalg.norm(upper_points_xyz - centers_xyz, axis = 1) * 2).reshape((-1, 1))
-        widths = (np.linalg.norm(open_points_xyz - centers_xyz, axis = 1) * 2).reshape((-1, 1))
-        scores = (self.scores)[valid_mask].reshape((-1, 1))
-        object_ids = (self.object_ids)[valid_mask].reshape((-1, 1))
+        depths = 0.02 * np.ones(valid_num)
+        heights = np.linalg.norm(upper_points_xyz - centers_xyz, axis = 1) * 2
+        widths = np.linalg.norm(open_points_xyz - centers_xyz, axis = 1) * 2
+        scores = (self.scores)[valid_mask]
+        object_ids = (self.object_ids)[valid_mask]
         translations = centers_xyz
         rotations = batch_key_point_2_rotation(centers_xyz, open_points_xyz, upper_points_xyz).reshape((-1, 9))
-        grasp_group = GraspGroup()
-        grasp_group.grasp_group_array = copy.deepcopy(np.hstack((scores, widths, heights, depths, rotations, translations, object_ids))).astype(np.float64)
-        return grasp_group
+        return GraspGroup.from_arrays(scores, widths, heights, depths, rotations, translations, object_ids)
 
     def sort_by_score(self, reverse = False):
         '''
@@ -1073,8 +1320,6 @@ class RectGraspGroup():
         '''
         if numGrasp > self.__len__():
             raise ValueError('Number of sampled grasp should be no more than the total number of grasps in the group')
-        shuffled_rect_grasp_group_array = copy.deepcopy(self.rect_grasp_group_array)
-        np.random.shuffle(shuffled_rect_grasp_group_array)
-        shuffled_rect_grasp_group = RectGraspGroup()
-        shuffled_rect_grasp_group.rect_grasp_group_array = copy.deepcopy(shuffled_rect_grasp_group_array[:numGrasp])
-        return shuffled_rect_grasp_group
+        # only the indices are permuted, the sampled rows are gathered without copying and shuffling every row
+        index = np.random.choice(self.__len__(), numGrasp, replace = False)
+        return RectGraspGroup(self.rect_grasp_group_array[index])
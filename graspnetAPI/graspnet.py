@@ -617,6 +617,7 @@ class GraspNet():
 
             # grasp = dict()
             grasp_group = GraspGroup()
+            obj_grasp_array_list = []
             for i, (obj_idx, trans) in enumerate(zip(obj_list, pose_list)):
 
                 sampled_points, offsets, fric_coefs = grasp_labels[obj_idx]
@@ -655,7 +656,9 @@ class GraspNet():
 
                 obj_grasp_array = np.hstack([scores, widths, heights, depths, rotations, target_points, object_ids]).astype(np.float32)
 
-                grasp_group.grasp_group_array = np.concatenate((grasp_group.grasp_group_array, obj_grasp_array))
+                obj_grasp_array_list.append(obj_grasp_array)
+            # concatenate once instead of growing the array object by object
+            grasp_group.grasp_group_array = np.concatenate([grasp_group.grasp_group_array] + obj_grasp_array_list)
             return grasp_group
         else:
             # 'rect'
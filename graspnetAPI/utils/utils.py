@@ -525,6 +525,77 @@ def plot_gripper_pro_max(center, R, width, depth, score=1, color=None):
     gripper.vertex_colors = o3d.utility.Vector3dVector(colors)
     return gripper
 
+def batch_plot_gripper_pro_max(centers, Rs, widths, depths, scores, color=None):
+    '''
+    **Input:**
+
+    - centers: numpy array of (-1,3), target points as gripper centers
+
+    - Rs: numpy array of (-1,3,3), rotation matrices of grippers
+
+    - widths: numpy array of (-1,), gripper widths
+
+    - depths: numpy array of (-1,), gripper depths
+
+    - scores: numpy array of (-1,), grasp quality scores
+
+    - color: optional, tuple of shape (3) denotes (r, g, b) for all the grippers
+
+    **Output:**
+
+    - open3d.geometry.TriangleMesh of all the grippers, same geometry as plot_gripper_pro_max for each of them.
+    '''
+    height = 0.015
+    tail_length = 0.04
+    depth_base = 0.038
+    finger_width = 0.003
+    num_grasp = centers.shape[0]
+
+    # vertices and triangles of create_mesh_box(1, 1, 1)
+    box_vertices = np.array([[0,0,0], [1,0,0], [0,0,1], [1,0,1],
+                             [0,1,0], [1,1,0], [0,1,1], [1,1,1]], dtype=np.float64)
+    box_triangles = np.array([[4,7,5],[4,6,7],[0,2,4],[2,6,4],
+                              [0,1,2],[1,3,2],[1,5,7],[1,7,3],
+                              [2,3,7],[2,7,6],[0,4,1],[1,4,5]])
+
+    # box sizes and offsets of the left finger, right finger, bottom and tail, (-1, 4, 3)
+    sizes = np.empty((num_grasp, 4, 3))
+    sizes[:, 0:2, 0] = (depths + depth_base + finger_width)[:, np.newaxis]
+    sizes[:, 0:2, 1] = finger_width
+    sizes[:, 2, 0] = finger_width
+    sizes[:, 2, 1] = widths
+    sizes[:, 3, 0] = tail_length
+    sizes[:, 3, 1] = finger_width
+    sizes[:, :, 2] = height
+    offsets = np.empty((num_grasp, 4, 3))
+    offsets[:, 0:3, 0] = -(depth_base + finger_width)
+    offsets[:, 3, 0] = -(tail_length + finger_width + depth_base)
+    offsets[:, 0, 1] = -(widths / 2 + finger_width)
+    offsets[:, 1, 1] = widths / 2
+    offsets[:, 2, 1] = -widths / 2
+    offsets[:, 3, 1] = -finger_width / 2
+    offsets[:, :, 2] = -height / 2
+
+    vertices = box_vertices * sizes[:, :, np.newaxis, :] + offsets[:, :, np.newaxis, :] # (-1, 4, 8, 3)
+    vertices = vertices.reshape((num_grasp, 32, 3))
+    vertices = np.matmul(vertices, Rs.swapaxes(-1, -2)) + centers[:, np.newaxis, :]
+    triangles = (box_triangles + 8 * np.arange(4)[:, np.newaxis, np.newaxis]).reshape((48, 3)) # (48, 3) for one gripper
+    triangles = triangles + 32 * np.arange(num_grasp)[:, np.newaxis, np.newaxis] # (-1, 48, 3)
+
+    colors = np.empty((num_grasp, 32, 3))
+    if color is not None:
+        colors[:] = color
+    else:
+        colors[:, :, 0] = scores[:, np.newaxis] # red for high score
+        colors[:, :, 1] = 0
+        colors[:, :, 2] = 1 - scores[:, np.newaxis] # blue for low score
+
+    gripper = o3d.geometry.TriangleMesh()
+    gripper.vertices = o3d.utility.Vector3dVector(vertices.reshape((-1, 3)))
+    gripper.triangles = o3d.utility.Vector3iVector(triangles.reshape((-1, 3)).astype(np.int32))
+    gripper.vertex_colors = o3d.utility.Vector3dVector(colors.reshape((-1, 3)))
+    return gripper
+
 
 def find_scene_by_model_id(dataset_root, model_id_list):
     picked_scene_names = []